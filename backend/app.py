@@ -5,8 +5,12 @@ Serves forecasting models and business insights via REST API
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import asyncio
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -21,7 +25,8 @@ from backend.model import ForecastingService
 app = FastAPI(
     title="BizPredict API",
     description="Smart Business Forecasting API for Ethiopia Sales Data",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -36,6 +41,41 @@ app.add_middleware(
 # Initialize service
 forecast_service = ForecastingService()
 
+# Artifact written by scripts/pretrain.py; when present, workers load the
+# fitted models instead of each retraining Prophet on startup
+SERVICE_ARTIFACT = os.environ.get('BIZPREDICT_ARTIFACT', 'artifacts/service.joblib')
+
+# Prophet fits/predicts run here so they don't stall the event loop;
+# Stan and numpy release the GIL for the heavy numeric work
+executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+# In-flight forecast computations keyed by request parameters, so
+# concurrent duplicate requests share one computation
+_inflight_forecasts = {}
+
+
+def _run_forecast(periods, category, region):
+    """Compute a forecast, coalescing concurrent duplicate requests"""
+    key = (periods, category, region)
+    loop = asyncio.get_running_loop()
+
+    future = _inflight_forecasts.get(key)
+    if future is None:
+        future = loop.run_in_executor(
+            executor,
+            partial(
+                forecast_service.generate_forecast,
+                periods=periods,
+                category=category,
+                region=region
+            )
+        )
+        _inflight_forecasts[key] = future
+        future.add_done_callback(lambda _: _inflight_forecasts.pop(key, None))
+
+    # Shield so one client disconnecting doesn't cancel the shared future
+    return asyncio.shield(future)
+
 
 # Pydantic models
 class ForecastRequest(BaseModel):
@@ -44,21 +84,6 @@ class ForecastRequest(BaseModel):
     region: Optional[str] = None
 
 
-class ForecastResponse(BaseModel):
-    dates: List[str]
-    predictions: List[float]
-    lower_bound: List[float]
-    upper_bound: List[float]
-    metrics: Dict
-
-
-class SalesStats(BaseModel):
-    total_sales: float
-    total_transactions: int
-    avg_transaction: float
-    date_range: Dict[str, str]
-
-
 class InsightItem(BaseModel):
     category: str
     severity: str
@@ -69,10 +94,17 @@ class InsightItem(BaseModel):
 
 @app.on_event("startup")
 async def startup_event():
-    """Load data and train model on startup"""
-    print("Loading sales data and training models...")
-    forecast_service.load_data()
-    forecast_service.train_model()
+    """Load the pre-trained service, or train from scratch on startup"""
+    global forecast_service
+
+    if os.path.exists(SERVICE_ARTIFACT):
+        import joblib
+        print(f"Loading pre-trained service from {SERVICE_ARTIFACT}...")
+        forecast_service = joblib.load(SERVICE_ARTIFACT)
+    else:
+        print("Loading sales data and training models...")
+        forecast_service.load_data()
+        forecast_service.train_model()
     print("✓ API ready!")
 
 
@@ -104,48 +136,50 @@ def health_check():
     }
 
 
-@app.get("/api/stats", response_model=SalesStats)
+@app.get("/api/stats")
 def get_sales_stats():
     """Get overall sales statistics"""
     if not forecast_service.data_loaded:
         raise HTTPException(status_code=503, detail="Data not loaded")
-    
-    stats = forecast_service.get_sales_stats()
-    return stats
+
+    # Response validation skipped: the dict is precomputed server-side
+    return ORJSONResponse(forecast_service.get_sales_stats())
 
 
-@app.post("/api/forecast", response_model=ForecastResponse)
-def get_forecast(request: ForecastRequest):
+@app.post("/api/forecast")
+async def get_forecast(request: ForecastRequest):
     """
     Generate sales forecast
-    
+
     Args:
         request: ForecastRequest with periods, category, region filters
-        
+
     Returns:
         Forecast predictions with confidence intervals
     """
     if not forecast_service.model_trained:
         raise HTTPException(status_code=503, detail="Model not trained")
-    
+
     try:
-        forecast = forecast_service.generate_forecast(
-            periods=request.periods,
-            category=request.category,
-            region=request.region
+        forecast = await _run_forecast(
+            request.periods, request.category, request.region
         )
-        return forecast
+        # Direct response: orjson handles the numpy prediction arrays
+        return ORJSONResponse(forecast)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/insights", response_model=List[InsightItem])
-def get_insights():
+async def get_insights():
     """Get business insights and recommendations"""
     if not forecast_service.data_loaded:
         raise HTTPException(status_code=503, detail="Data not loaded")
-    
-    insights = forecast_service.generate_insights()
+
+    loop = asyncio.get_running_loop()
+    insights = await loop.run_in_executor(
+        executor, forecast_service.generate_insights
+    )
     return insights
 
 
@@ -210,9 +244,21 @@ def get_historical_data(
         end_date=end_date,
         category=category
     )
-    return data
+    # Return the response directly so orjson serializes the numpy sales
+    # array without the jsonable_encoder pass
+    return ORJSONResponse(data)
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "backend.app:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=os.cpu_count(),
+        # auto resolves to uvloop where it's installed; uvloop doesn't
+        # exist on Windows, the documented launch path
+        loop="auto",
+        http="httptools",
+        access_log=False
+    )
@@ -3,30 +3,164 @@ Forecasting Service Backend
 Handles data loading, model training, and predictions
 """
 
+import os
 import pandas as pd
 import numpy as np
 from prophet import Prophet
+from joblib import Parallel, delayed
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _mae_mape(yhat, y):
+    """Fused single-pass MAE/MAPE over two aligned arrays"""
+    abs_sum = 0.0
+    pct_sum = 0.0
+    n = yhat.shape[0]
+    for i in range(n):
+        diff = abs(yhat[i] - y[i])
+        abs_sum += diff
+        if y[i] != 0:
+            pct_sum += diff / abs(y[i])
+    return abs_sum / n, 100.0 * pct_sum / n
+
+
+if njit is not None:
+    _mae_mape = njit(cache=True, fastmath=True)(_mae_mape)
+
+
+def _fit_prophet(df_daily):
+    """Fit a Prophet model on a ds/y frame
+
+    Module-level so joblib can ship it to worker processes.
+    """
+    model = Prophet(
+        yearly_seasonality=True,
+        weekly_seasonality=True,
+        changepoint_prior_scale=0.05,
+        seasonality_mode='multiplicative'
+    )
+    model.fit(df_daily)
+    return model
+
 
 class ForecastingService:
     """Service for managing forecasting operations"""
     
+    FORECAST_CACHE_SIZE = 64
+
     def __init__(self, data_path='data/raw/ethiopia_sales_raw.csv'):
         self.data_path = data_path
         self.df = None
         self.model = None
         self.data_loaded = False
         self.model_trained = False
-        
+        self._data_version = 0
+        self._dates = None
+        self._forecast_cache = {}
+        self._sub_models = {}
+        self._cat_idx = {}
+        self._region_idx = {}
+        self._daily = None
+        self._weekly = None
+        self._monthly = None
+        self._daily_by_cat = {}
+        self._daily_by_region = {}
+        self._cat_totals = None
+        self._region_totals = None
+        self._df_mi = None
+        self._sales_stats = None
+        self._product_stats = None
+        self._region_stats = None
+        self._categories = None
+
     def load_data(self):
         """Load sales data"""
         try:
-            self.df = pd.read_csv(self.data_path)
-            self.df['date'] = pd.to_datetime(self.df['date'])
+            parquet_path = self.data_path.replace('.csv', '.parquet')
+            if os.path.exists(parquet_path):
+                # Parquet is typed and columnar: no string/date re-parsing
+                self.df = pd.read_parquet(parquet_path)
+            else:
+                # Low-cardinality string columns load as category: ~10x less
+                # memory and integer-code paths for groupby/filtering
+                self.df = pd.read_csv(
+                    self.data_path,
+                    dtype={
+                        'product_category': 'category',
+                        'region': 'category',
+                        'customer_segment': 'category'
+                    }
+                )
+                self.df['date'] = pd.to_datetime(self.df['date'])
+                # Cache a Parquet copy so the next startup skips CSV parsing
+                try:
+                    self.df.to_parquet(parquet_path)
+                except (ImportError, OSError) as e:
+                    print(f"Could not cache Parquet copy: {e}")
+
+            # Keep the frame sorted by date so date-range filters can use
+            # binary search instead of full-column comparisons
+            self.df = self.df.sort_values('date', kind='mergesort')
+            self.df = self.df.reset_index(drop=True)
+            self._dates = self.df['date'].to_numpy()
+
+            # Precompute row indices per category/region so filters are
+            # array lookups instead of full-frame copies and scans
+            self._cat_idx = {
+                c: g.index.to_numpy()
+                for c, g in self.df.groupby('product_category', sort=False, observed=True)
+            }
+            self._region_idx = {
+                r: g.index.to_numpy()
+                for r, g in self.df.groupby('region', sort=False, observed=True)
+            }
+
+            # Materialize daily/weekly/monthly rollups once instead of
+            # re-aggregating the full transaction table per request
+            self._daily = self.df.groupby('date')['total_sales'].sum()
+            self._weekly = self._daily.groupby(
+                self._daily.index.to_period('W')
+            ).sum()
+            self._monthly = self._daily.groupby(
+                self._daily.index.to_period('M')
+            ).sum()
+            self._daily_by_cat = {
+                c: self.df.iloc[idx].groupby('date')['total_sales'].sum()
+                for c, idx in self._cat_idx.items()
+            }
+            self._daily_by_region = {
+                r: self.df.iloc[idx].groupby('date')['total_sales'].sum()
+                for r, idx in self._region_idx.items()
+            }
+            # Sorted MultiIndex view for O(log N) joint-filter lookups
+            self._df_mi = self.df.set_index(
+                ['product_category', 'region']
+            ).sort_index()
+            self._cat_totals = self.df.groupby(
+                'product_category', sort=False, observed=True
+            )['total_sales'].sum()
+            self._region_totals = self.df.groupby(
+                'region', sort=False, observed=True
+            )['total_sales'].sum()
+
+            # Request-ready stats, computed once: the data is immutable
+            # after load so the getters just return these
+            self._sales_stats = self._compute_sales_stats()
+            self._product_stats = self._compute_product_stats()
+            self._region_stats = self._compute_region_stats()
+            self._categories = sorted(self.df['product_category'].unique().tolist())
+
             self.data_loaded = True
+            # Invalidate cached forecasts built from the previous dataset
+            self._data_version += 1
+            self._forecast_cache.clear()
             print(f"✓ Loaded {len(self.df)} transactions")
         except Exception as e:
             print(f"Error loading data: {e}")
@@ -37,10 +171,9 @@ class ForecastingService:
         if not self.data_loaded:
             raise ValueError("Data not loaded")
         
-        # Aggregate daily sales
-        df_daily = self.df.groupby('date')['total_sales'].sum().reset_index()
-        df_daily.columns = ['ds', 'y']
-        
+        # Daily sales were already aggregated in load_data()
+        df_daily = self._daily.rename_axis('ds').reset_index(name='y')
+
         # Initialize and train model
         self.model = Prophet(
             yearly_seasonality=True,
@@ -58,9 +191,65 @@ class ForecastingService:
         )
         
         self.model.fit(df_daily)
+
+        # Pre-fit per-category and per-region models so filtered forecast
+        # requests don't pay for a Prophet fit on the request path; the
+        # fits are independent, so run them across all cores
+        keys = [(c, None) for c in self._cat_idx]
+        keys += [(None, r) for r in self._region_idx]
+        frames = [
+            self._daily_sales(category, region).rename_axis('ds').reset_index(name='y')
+            for category, region in keys
+        ]
+        models = Parallel(n_jobs=-1, backend='loky')(
+            delayed(_fit_prophet)(frame) for frame in frames
+        )
+        self._sub_models = dict(zip(keys, models))
+
         self.model_trained = True
         print("✓ Model trained successfully")
-        
+
+    def _filter_df(self, category=None, region=None):
+        """Select rows for a filter combination via precomputed indices"""
+        if category and region:
+            try:
+                # Sorted-index slice instead of scanning two boolean masks
+                return self._df_mi.loc[(category, region)]
+            except KeyError:
+                return self._df_mi.iloc[0:0]
+        if category:
+            return self.df.iloc[self._cat_idx[category]]
+        if region:
+            return self.df.iloc[self._region_idx[region]]
+        return self.df
+
+    def _daily_sales(self, category=None, region=None):
+        """Daily total-sales series for a filter combination, served from
+        the rollups materialized in load_data() where possible"""
+        if category and region:
+            return self._filter_df(category, region).groupby(
+                'date'
+            )['total_sales'].sum()
+        if category:
+            return self._daily_by_cat[category]
+        if region:
+            return self._daily_by_region[region]
+        return self._daily
+
+    def _fit_sub_model(self, daily_sales):
+        """Fit a Prophet model on a daily total-sales series"""
+        return _fit_prophet(daily_sales.rename_axis('ds').reset_index(name='y'))
+
+    def _get_sub_model(self, category, region):
+        """Return the fitted model for a filter combination, fitting on
+        first use for (category, region) pairs not built at startup"""
+        key = (category, region)
+        if key not in self._sub_models:
+            self._sub_models[key] = self._fit_sub_model(
+                self._daily_sales(category, region)
+            )
+        return self._sub_models[key]
+
     def generate_forecast(self, periods=90, category=None, region=None):
         """
         Generate forecast with optional filters
@@ -75,27 +264,20 @@ class ForecastingService:
         """
         if not self.model_trained:
             raise ValueError("Model not trained")
-        
-        # Filter data if needed
-        df_filtered = self.df.copy()
-        if category:
-            df_filtered = df_filtered[df_filtered['product_category'] == category]
-        if region:
-            df_filtered = df_filtered[df_filtered['region'] == region]
-        
-        # If filtered, retrain on subset
+
+        # Repeat requests for the same filters are served from cache instead
+        # of re-running Prophet (seconds per fit/predict)
+        cache_key = (self._data_version, periods, category, region)
+        cached = self._forecast_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Daily sales for this filter combination (precomputed rollups)
+        daily_sales = self._daily_sales(category, region)
+
+        # Use the pre-fitted model for this filter combination
         if category or region:
-            df_daily = df_filtered.groupby('date')['total_sales'].sum().reset_index()
-            df_daily.columns = ['ds', 'y']
-            
-            temp_model = Prophet(
-                yearly_seasonality=True,
-                weekly_seasonality=True,
-                changepoint_prior_scale=0.05,
-                seasonality_mode='multiplicative'
-            )
-            temp_model.fit(df_daily)
-            model = temp_model
+            model = self._get_sub_model(category, region)
         else:
             model = self.model
         
@@ -108,20 +290,23 @@ class ForecastingService:
         
         # Calculate metrics on historical data
         historical = forecast.iloc[:-periods]
-        df_daily = df_filtered.groupby('date')['total_sales'].sum().reset_index()
-        
-        if len(historical) > 0 and len(df_daily) > 0:
-            mae = np.mean(np.abs(historical['yhat'].values - df_daily['total_sales'].values))
-            mape = np.mean(np.abs((df_daily['total_sales'].values - historical['yhat'].values) / df_daily['total_sales'].values)) * 100
+
+        if len(historical) > 0 and len(daily_sales) > 0:
+            mae, mape = _mae_mape(
+                historical['yhat'].to_numpy(),
+                daily_sales.to_numpy(dtype=np.float64)
+            )
         else:
             mae = 0
             mape = 0
         
-        return {
+        # Numeric columns stay numpy arrays; orjson serializes them
+        # directly without building lists of boxed floats
+        result = {
             'dates': forecast_future['ds'].dt.strftime('%Y-%m-%d').tolist(),
-            'predictions': forecast_future['yhat'].round(2).tolist(),
-            'lower_bound': forecast_future['yhat_lower'].round(2).tolist(),
-            'upper_bound': forecast_future['yhat_upper'].round(2).tolist(),
+            'predictions': np.round(forecast_future['yhat'].to_numpy(), 2),
+            'lower_bound': np.round(forecast_future['yhat_lower'].to_numpy(), 2),
+            'upper_bound': np.round(forecast_future['yhat_upper'].to_numpy(), 2),
             'metrics': {
                 'mae': float(mae),
                 'mape': float(mape),
@@ -129,12 +314,22 @@ class ForecastingService:
                 'avg_daily': float(forecast_future['yhat'].mean())
             }
         }
-    
+
+        if len(self._forecast_cache) >= self.FORECAST_CACHE_SIZE:
+            self._forecast_cache.pop(next(iter(self._forecast_cache)))
+        self._forecast_cache[cache_key] = result
+
+        return result
+
     def get_sales_stats(self):
         """Get overall sales statistics"""
         if not self.data_loaded:
             raise ValueError("Data not loaded")
-        
+
+        return self._sales_stats
+
+    def _compute_sales_stats(self):
+        """Compute the overall sales statistics dict"""
         return {
             'total_sales': float(self.df['total_sales'].sum()),
             'total_transactions': int(len(self.df)),
@@ -144,59 +339,54 @@ class ForecastingService:
                 'end': str(self.df['date'].max().date())
             }
         }
-    
+
     def get_product_stats(self):
         """Get product category statistics"""
-        product_stats = self.df.groupby('product_category').agg({
-            'total_sales': ['sum', 'mean', 'count']
-        }).round(2)
-        
-        product_stats.columns = ['total_sales', 'avg_sales', 'num_transactions']
+        return self._product_stats
+
+    def _compute_product_stats(self):
+        """Compute the per-category statistics records"""
+        product_stats = self.df.groupby(
+            'product_category', sort=False, observed=True
+        )['total_sales'].agg(
+            total_sales='sum',
+            avg_sales='mean',
+            num_transactions='count'
+        ).round(2)
+
         product_stats = product_stats.sort_values('total_sales', ascending=False)
-        
-        result = []
-        for product, row in product_stats.iterrows():
-            result.append({
-                'product': product,
-                'total_sales': float(row['total_sales']),
-                'avg_sales': float(row['avg_sales']),
-                'num_transactions': int(row['num_transactions'])
-            })
-        
-        return result
-    
+        product_stats = product_stats.reset_index()
+        product_stats = product_stats.rename(columns={'product_category': 'product'})
+
+        return product_stats.to_dict(orient='records')
+
     def get_region_stats(self):
         """Get regional statistics"""
-        region_stats = self.df.groupby('region').agg({
-            'total_sales': ['sum', 'mean', 'count']
-        }).round(2)
-        
-        region_stats.columns = ['total_sales', 'avg_sales', 'num_transactions']
+        return self._region_stats
+
+    def _compute_region_stats(self):
+        """Compute the per-region statistics records"""
+        region_stats = self.df.groupby(
+            'region', sort=False, observed=True
+        )['total_sales'].agg(
+            total_sales='sum',
+            avg_sales='mean',
+            num_transactions='count'
+        ).round(2)
+
         region_stats = region_stats.sort_values('total_sales', ascending=False)
-        
-        result = []
-        for region, row in region_stats.iterrows():
-            result.append({
-                'region': region,
-                'total_sales': float(row['total_sales']),
-                'avg_sales': float(row['avg_sales']),
-                'num_transactions': int(row['num_transactions'])
-            })
-        
-        return result
-    
+        region_stats = region_stats.reset_index()
+
+        return region_stats.to_dict(orient='records')
+
     def get_trends(self, period='monthly'):
         """Get sales trends"""
-        df_copy = self.df.copy()
-        
         if period == 'daily':
-            trends = df_copy.groupby('date')['total_sales'].sum()
+            trends = self._daily
         elif period == 'weekly':
-            df_copy['week'] = df_copy['date'].dt.to_period('W')
-            trends = df_copy.groupby('week')['total_sales'].sum()
+            trends = self._weekly
         else:  # monthly
-            df_copy['month'] = df_copy['date'].dt.to_period('M')
-            trends = df_copy.groupby('month')['total_sales'].sum()
+            trends = self._monthly
         
         return {
             'periods': [str(p) for p in trends.index],
@@ -205,35 +395,40 @@ class ForecastingService:
     
     def get_categories(self):
         """Get list of product categories"""
-        return sorted(self.df['product_category'].unique().tolist())
+        return self._categories
     
     def get_historical_data(self, start_date=None, end_date=None, category=None):
         """Get historical data with filters"""
-        df_filtered = self.df.copy()
-        
+        # Binary-search the pre-sorted date column for the range bounds
+        lo = 0
+        hi = len(self._dates)
         if start_date:
-            df_filtered = df_filtered[df_filtered['date'] >= pd.to_datetime(start_date)]
+            lo = np.searchsorted(self._dates, pd.to_datetime(start_date).to_datetime64())
         if end_date:
-            df_filtered = df_filtered[df_filtered['date'] <= pd.to_datetime(end_date)]
+            hi = np.searchsorted(
+                self._dates, pd.to_datetime(end_date).to_datetime64(), side='right'
+            )
+        df_filtered = self.df.iloc[lo:hi]
+
         if category:
             df_filtered = df_filtered[df_filtered['product_category'] == category]
         
         daily_sales = df_filtered.groupby('date')['total_sales'].sum().reset_index()
-        
+
+        # Dates stay Python strings (fixed format); sales stay a numpy
+        # array that orjson serializes without per-element boxing
         return {
             'dates': daily_sales['date'].dt.strftime('%Y-%m-%d').tolist(),
-            'sales': daily_sales['total_sales'].round(2).tolist()
+            'sales': daily_sales['total_sales'].round(2).to_numpy()
         }
     
     def generate_insights(self):
         """Generate business insights"""
         insights = []
         
-        # Growth trend
-        monthly_sales = self.df.groupby(
-            self.df['date'].dt.to_period('M')
-        )['total_sales'].sum()
-        growth_rate = monthly_sales.pct_change().mean() * 100
+        # Growth trend from the precomputed monthly rollup
+        monthly = self._monthly.to_numpy()
+        growth_rate = float(np.mean(np.diff(monthly) / monthly[:-1])) * 100
         
         if growth_rate > 5:
             insights.append({
@@ -245,7 +440,7 @@ class ForecastingService:
             })
         
         # Top product
-        top_product = self.df.groupby('product_category')['total_sales'].sum().idxmax()
+        top_product = self._cat_totals.idxmax()
         insights.append({
             'category': 'Products',
             'severity': 'info',
@@ -255,7 +450,7 @@ class ForecastingService:
         })
         
         # Top region
-        top_region = self.df.groupby('region')['total_sales'].sum().idxmax()
+        top_region = self._region_totals.idxmax()
         insights.append({
             'category': 'Geography',
             'severity': 'info',
@@ -5,9 +5,11 @@ Interactive visualization and forecasting interface
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+import html
 import sys
 import os
 
@@ -15,8 +17,10 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from data_generator import EthiopiaSalesDataGenerator
-from forecasting_model import SalesForecaster
-from insight_engine import InsightEngine
+
+# forecasting_model and insight_engine are imported lazily inside the
+# helpers that use them: they pull in Prophet and scikit-learn, which add
+# seconds to cold start even for users who never leave the Overview tab
 
 
 # Page configuration
@@ -126,6 +130,18 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+def as_categorical(df):
+    """Cast low-cardinality string columns to category dtype
+
+    Groupbys and filters then run on small integer codes instead of
+    hashing a Python string per row.
+    """
+    for col in ('region', 'product_category', 'customer_segment', 'currency'):
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype('category')
+    return df
+
+
 @st.cache_data
 def load_data():
     """Load sales data"""
@@ -133,27 +149,257 @@ def load_data():
     # Get project root directory (parent of dashboard)
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     data_path = os.path.join(project_root, 'data', 'raw', 'ethiopia_sales_raw.csv')
-    
-    try:
-        df = pd.read_csv(data_path)
-        df['date'] = pd.to_datetime(df['date'])
-        return df
-    except FileNotFoundError:
-        st.warning("Sales data not found. Generating sample data...")
-        # Change to project root for data generation
-        original_dir = os.getcwd()
-        os.chdir(project_root)
+    parquet_path = data_path.replace('.csv', '.parquet')
+
+    # Prefer Parquet: typed and columnar, so no string/date parsing
+    if os.path.exists(parquet_path):
+        df = pd.read_parquet(parquet_path, engine='pyarrow')
+    else:
         try:
+            df = pd.read_csv(data_path)
+            df['date'] = pd.to_datetime(df['date'])
+        except FileNotFoundError:
+            st.warning("Sales data not found. Generating sample data...")
+            # Write to the absolute path directly; chdir would mutate
+            # process-wide state shared by every Streamlit session
             generator = EthiopiaSalesDataGenerator()
-            df = generator.save_data()
-            return df
-        finally:
-            os.chdir(original_dir)
+            df = generator.save_data(output_path=data_path)
+
+    # Sorted by date so the filters can binary-search the range instead
+    # of scanning every row (mergesort keeps same-day rows in order)
+    return as_categorical(df).sort_values(
+        'date', kind='mergesort', ignore_index=True
+    )
+
+
+def m4_downsample(df, y_col, width=1000):
+    """Downsample a line series to at most ~4 points per x-pixel bucket
+
+    Keeps each bucket's first, last, lowest and highest rows (the M4
+    aggregation), which preserves the rendered shape of the line while
+    sending far fewer points to the browser.
+    """
+    if len(df) <= 4 * width:
+        return df
+
+    df = df.reset_index(drop=True)
+    buckets = (np.arange(len(df)) * width) // len(df)
+    grouped = df.groupby(buckets)
+    keep = np.concatenate([
+        grouped.head(1).index.to_numpy(),
+        grouped.tail(1).index.to_numpy(),
+        grouped[y_col].idxmin().to_numpy(),
+        grouped[y_col].idxmax().to_numpy()
+    ])
+    return df.loc[np.unique(keep)]
+
+
+# Pre-aggregated views of the (filtered) data. Streamlit reruns the whole
+# script on every widget change; caching these keeps each tab switch from
+# redoing the O(N) groupbys.
+
+def _df_fingerprint(df):
+    """Cheap DataFrame fingerprint: length, date endpoints and sales sum"""
+    if len(df) == 0:
+        # Filters can produce an empty frame; keep it hashable
+        return (0, None, None, 0.0)
+    return (
+        len(df),
+        int(df['date'].iloc[0].value),
+        int(df['date'].iloc[-1].value),
+        float(df['total_sales'].sum())
+    )
+
+
+@st.cache_data(hash_funcs={pd.DataFrame: _df_fingerprint})
+def date_bounds(df):
+    """Min/max of the date column, keyed on the data fingerprint
+
+    Called with both the full and the filtered frame, so the key must
+    distinguish datasets — id() of short-lived copies cannot.
+    """
+    return df['date'].min(), df['date'].max()
+
+
+@st.cache_data(hash_funcs={pd.DataFrame: _df_fingerprint})
+def apply_filters(df, start_date, end_date, regions, categories):
+    """Filter by date range, region list and product-category list
+
+    The frame is hashed by its fingerprint: st.cache_data returns a
+    fresh copy of the loaded frame on every rerun, so identity hashing
+    would never hit and could collide on recycled addresses. The
+    fingerprint is stable across reruns and changes with the dataset.
+
+    load_data returns the frame sorted by date, so the date range is a
+    binary search into a contiguous slice; only that slice is scanned
+    for the region/category membership tests.
+    """
+    dates = df['date'].to_numpy()
+    lo = np.searchsorted(dates, pd.to_datetime(start_date).to_datetime64(), side='left')
+    hi = np.searchsorted(dates, pd.to_datetime(end_date).to_datetime64(), side='right')
+    window = df.iloc[lo:hi]
+
+    mask = (
+        window['region'].isin(regions)
+        & window['product_category'].isin(categories)
+    )
+    return window[mask]
+
+
+@st.cache_data
+def daily_sales(df):
+    """Daily total sales"""
+    return df.groupby('date', observed=True)['total_sales'].sum().reset_index()
+
+
+@st.cache_data
+def monthly_sales(df):
+    """Monthly total sales, indexed by month start
+
+    The datetime64[M] cast truncates to month as a plain array view;
+    to_period would allocate a Period object per row.
+    """
+    return df.groupby(
+        df['date'].values.astype('datetime64[M]'), observed=True
+    )['total_sales'].sum()
+
+
+@st.cache_data
+def product_sales(df):
+    """Total sales per product category, highest first"""
+    return df.groupby(
+        'product_category', observed=True
+    )['total_sales'].sum().sort_values(ascending=False)
+
+
+@st.cache_data
+def region_sales(df):
+    """Total sales per region, highest first"""
+    return df.groupby(
+        'region', observed=True
+    )['total_sales'].sum().sort_values(ascending=False)
+
+
+@st.cache_data
+def segment_sales(df):
+    """Total sales per customer segment, highest first"""
+    return df.groupby(
+        'customer_segment', observed=True
+    )['total_sales'].sum().sort_values(ascending=False)
+
+
+@st.cache_data
+def monthly_regional_sales(df):
+    """Monthly total sales per region"""
+    months = df['date'].values.astype('datetime64[M]')
+    monthly_regional = df.groupby(
+        [months, 'region'], observed=True
+    )['total_sales'].sum().rename_axis(['date', 'region']).reset_index()
+    # Format labels on the small grouped output, not the full row set
+    monthly_regional['date'] = monthly_regional['date'].dt.strftime('%Y-%m')
+    return monthly_regional
+
+
+@st.cache_data(hash_funcs={pd.DataFrame: _df_fingerprint})
+def compute_insights(df):
+    """Generate business insights, memoized on the data fingerprint"""
+    from insight_engine import InsightEngine
+    return InsightEngine(df).generate_all_insights()
+
+
+@st.cache_data
+def stats_table(df, key_col):
+    """Sum/mean/count statistics per value of key_col, highest sum first"""
+    stats = df.groupby(key_col, observed=True).agg({
+        'total_sales': ['sum', 'mean', 'count']
+    }).round(2)
+    stats.columns = ['Total Sales', 'Avg Transaction', 'Num Transactions']
+    return stats.sort_values('Total Sales', ascending=False)
 
 
-@st.cache_resource
+# Figure builders return plain dicts (cheap to cache and pickle); callers
+# rehydrate with go.Figure. Building a plotly.express figure costs hundreds
+# of milliseconds even for small frames, so it shouldn't happen per rerun.
+
+@st.cache_data
+def hbar_fig(series, x_label, y_label, color_scale):
+    """Horizontal bar chart of a sorted series"""
+    fig = px.bar(
+        x=series.values,
+        y=series.index,
+        orientation='h',
+        labels={'x': x_label, 'y': y_label},
+        color=series.values,
+        color_continuous_scale=color_scale
+    )
+    return fig.to_dict()
+
+
+@st.cache_data
+def monthly_bar_fig(monthly_df):
+    """Monthly sales bar chart"""
+    fig = px.bar(
+        monthly_df,
+        x='Month',
+        y='Sales',
+        title='Monthly Sales Performance',
+        labels={'Sales': 'Total Sales (ETB)'}
+    )
+    fig.update_layout(height=400)
+    return fig.to_dict()
+
+
+@st.cache_data
+def segment_pie_fig(series):
+    """Sales-distribution pie chart per customer segment"""
+    fig = px.pie(
+        values=series.values,
+        names=series.index,
+        title='Sales Distribution by Customer Segment'
+    )
+    return fig.to_dict()
+
+
+@st.cache_data
+def region_comparison_fig(region_stats):
+    """Total sales per region bar chart"""
+    fig = px.bar(
+        x=region_stats.index,
+        y=region_stats['Total Sales'],
+        title='Total Sales by Region',
+        labels={'x': 'Region', 'y': 'Total Sales (ETB)'},
+        color=region_stats['Total Sales'],
+        color_continuous_scale='Viridis'
+    )
+    fig.update_layout(height=400)
+    return fig.to_dict()
+
+
+@st.cache_data
+def monthly_regional_fig(monthly_regional):
+    """Monthly sales lines per region"""
+    fig = px.line(
+        monthly_regional,
+        x='date',
+        y='total_sales',
+        color='region',
+        title='Monthly Sales by Region',
+        labels={'date': 'Month', 'total_sales': 'Total Sales (ETB)', 'region': 'Region'},
+        render_mode='webgl'
+    )
+    fig.update_layout(height=500)
+    return fig.to_dict()
+
+
+@st.cache_resource(hash_funcs={pd.DataFrame: _df_fingerprint})
 def train_forecaster(df):
-    """Train forecasting model"""
+    """Train forecasting model
+
+    Keyed on the cheap data fingerprint, so repeated "Generate Forecast"
+    clicks (and reruns) reuse the fitted model instead of hashing the
+    whole frame or retraining Prophet.
+    """
+    from forecasting_model import SalesForecaster
     forecaster = SalesForecaster()
     forecaster.prepare_data(df, test_size=90)
     forecaster.train_model()
@@ -192,9 +438,38 @@ def main():
         # Load data with beautiful status
         if uploaded_file is not None:
             try:
-                df = pd.read_csv(uploaded_file)
-                df['date'] = pd.to_datetime(df['date'])
-                
+                df = None
+                try:
+                    # pyarrow parses across all cores, types the date
+                    # column in-line and dictionary-encodes the
+                    # categorical columns directly
+                    import pyarrow as pa
+                    import pyarrow.csv as pv
+                    convert_options = pv.ConvertOptions(column_types={
+                        'date': pa.timestamp('ns'),
+                        'region': pa.dictionary(pa.int32(), pa.string()),
+                        'product_category': pa.dictionary(pa.int32(), pa.string()),
+                        'customer_segment': pa.dictionary(pa.int32(), pa.string())
+                    })
+                    try:
+                        df = pv.read_csv(
+                            uploaded_file, convert_options=convert_options
+                        ).to_pandas()
+                    except pa.ArrowInvalid:
+                        # Arrow only parses ISO dates into the typed
+                        # column; rewind and let pandas infer the format
+                        uploaded_file.seek(0)
+                except ImportError:
+                    pass
+                if df is None:
+                    df = pd.read_csv(uploaded_file)
+                    df['date'] = pd.to_datetime(df['date'])
+                # Same date-sorted layout as load_data, so the filter's
+                # binary search works on uploaded data too
+                df = as_categorical(df).sort_values(
+                    'date', kind='mergesort', ignore_index=True
+                )
+
                 # Beautiful success message
                 st.markdown(f"""
                 <div style='background-color: #d4edda; 
@@ -249,9 +524,10 @@ def main():
         
         # Compact Filters with Expander
         with st.expander("🎛️ Filters", expanded=True):
+            dmin, dmax = date_bounds(df)
             date_range = st.date_input(
                 "📅 Date",
-                value=(df['date'].min(), df['date'].max()),
+                value=(dmin, dmax),
                 label_visibility="visible"
             )
             
@@ -267,13 +543,14 @@ def main():
                 default=sorted(df['product_category'].unique())
             )
         
-        # Filter data
-        df_filtered = df[
-            (df['date'] >= pd.to_datetime(date_range[0])) &
-            (df['date'] <= pd.to_datetime(date_range[1])) &
-            (df['region'].isin(selected_regions)) &
-            (df['product_category'].isin(selected_categories))
-        ]
+        # Filter data (memoized on the widget values)
+        df_filtered = apply_filters(
+            df,
+            date_range[0],
+            date_range[1],
+            tuple(sorted(selected_regions)),
+            tuple(sorted(selected_categories))
+        )
         
         st.caption(f"📊 {len(df_filtered):,} / {len(df):,} records")
     
@@ -322,21 +599,23 @@ def show_overview(df):
         st.metric("Avg Transaction", f"ETB {avg_transaction:,.2f}")
     
     with col4:
-        num_days = (df['date'].max() - df['date'].min()).days + 1
+        dmin, dmax = date_bounds(df)
+        num_days = (dmax - dmin).days + 1
         st.metric("Days of Data", f"{num_days:,}")
     
     st.markdown("---")
     
     # Sales trend
     st.subheader("📈 Sales Trend Over Time")
-    daily_sales = df.groupby('date')['total_sales'].sum().reset_index()
-    
+    daily = m4_downsample(daily_sales(df), 'total_sales')
+
     fig = px.line(
-        daily_sales,
+        daily,
         x='date',
         y='total_sales',
         title='Daily Sales Performance',
-        labels={'date': 'Date', 'total_sales': 'Total Sales (ETB)'}
+        labels={'date': 'Date', 'total_sales': 'Total Sales (ETB)'},
+        render_mode='webgl'
     )
     fig.update_layout(height=400)
     st.plotly_chart(fig, use_container_width=True)
@@ -347,29 +626,17 @@ def show_overview(df):
     with col1:
         # Product performance
         st.subheader("🛍️ Sales by Product Category")
-        product_sales = df.groupby('product_category')['total_sales'].sum().sort_values(ascending=False)
-        fig = px.bar(
-            x=product_sales.values,
-            y=product_sales.index,
-            orientation='h',
-            labels={'x': 'Total Sales (ETB)', 'y': 'Product Category'},
-            color=product_sales.values,
-            color_continuous_scale='Blues'
-        )
+        fig = go.Figure(hbar_fig(
+            product_sales(df), 'Total Sales (ETB)', 'Product Category', 'Blues'
+        ))
         st.plotly_chart(fig, use_container_width=True)
-    
+
     with col2:
         # Regional performance
         st.subheader("🗺️ Sales by Region")
-        region_sales = df.groupby('region')['total_sales'].sum().sort_values(ascending=False)
-        fig = px.bar(
-            x=region_sales.values,
-            y=region_sales.index,
-            orientation='h',
-            labels={'x': 'Total Sales (ETB)', 'y': 'Region'},
-            color=region_sales.values,
-            color_continuous_scale='Greens'
-        )
+        fig = go.Figure(hbar_fig(
+            region_sales(df), 'Total Sales (ETB)', 'Region', 'Greens'
+        ))
         st.plotly_chart(fig, use_container_width=True)
 
 
@@ -415,16 +682,19 @@ def show_forecasting(df):
             # Plot forecast
             st.subheader("📊 Forecast Visualization")
             
-            # Prepare data for plotting
-            historical = df.groupby('date')['total_sales'].sum().reset_index()
+            # Prepare data for plotting (downsampled to screen resolution)
+            historical = df.groupby('date', observed=True)['total_sales'].sum().reset_index()
             historical.columns = ['ds', 'y']
-            
-            forecast_plot = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+            historical = m4_downsample(historical, 'y')
+
+            forecast_plot = m4_downsample(
+                forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']], 'yhat'
+            )
             
             fig = go.Figure()
             
             # Historical data
-            fig.add_trace(go.Scatter(
+            fig.add_trace(go.Scattergl(
                 x=historical['ds'],
                 y=historical['y'],
                 name='Historical',
@@ -432,29 +702,27 @@ def show_forecasting(df):
             ))
             
             # Forecast
-            fig.add_trace(go.Scatter(
+            fig.add_trace(go.Scattergl(
                 x=forecast_plot['ds'],
                 y=forecast_plot['yhat'],
                 name='Forecast',
                 line=dict(color='red', dash='dash')
             ))
             
-            # Confidence interval
-            fig.add_trace(go.Scatter(
-                x=forecast_plot['ds'],
-                y=forecast_plot['yhat_upper'],
-                fill=None,
+            # Confidence interval: one closed polygon (upper bound
+            # forward, lower bound back) instead of two stacked traces
+            band_x = pd.concat([forecast_plot['ds'], forecast_plot['ds'][::-1]])
+            band_y = pd.concat([
+                forecast_plot['yhat_upper'], forecast_plot['yhat_lower'][::-1]
+            ])
+            fig.add_trace(go.Scattergl(
+                x=band_x,
+                y=band_y,
+                fill='toself',
+                fillcolor='rgba(255,0,0,0.15)',
                 mode='lines',
-                line=dict(color='rgba(255,0,0,0)'),
-                showlegend=False
-            ))
-            
-            fig.add_trace(go.Scatter(
-                x=forecast_plot['ds'],
-                y=forecast_plot['yhat_lower'],
-                fill='tonexty',
-                mode='lines',
-                line=dict(color='rgba(255,0,0,0)'),
+                line=dict(width=0),
+                hoverinfo='skip',
                 name='Confidence Interval'
             ))
             
@@ -485,32 +753,36 @@ def show_insights(df):
     """Insights page"""
     st.header("💡 Business Insights & Recommendations")
     
-    # Generate insights
+    # Generate insights (cached across reruns for the same data)
     with st.spinner('Analyzing data and generating insights...'):
-        engine = InsightEngine(df)
-        insights = engine.generate_all_insights()
+        insights = compute_insights(df)
     
     st.success(f"✓ Generated {len(insights)} insights")
-    
-    # Display insights by category
-    categories = ['Growth', 'Seasonality', 'Products', 'Geography', 'Customers', 'Forecast']
-    
-    for category in categories:
+
+    # Display insights by category, batched into a single markdown call:
+    # each st.markdown is a separate WebSocket round-trip to the browser
+    category_icons = {
+        'Growth': '📈', 'Seasonality': '🔄', 'Products': '🛍️',
+        'Geography': '🗺️', 'Customers': '👥', 'Forecast': '🔮'
+    }
+
+    parts = []
+    for category, icon in category_icons.items():
         category_insights = [i for i in insights if i['category'] == category]
-        
+
         if category_insights:
-            st.subheader(f"{'📈' if category == 'Growth' else '🔄' if category == 'Seasonality' else '🛍️' if category == 'Products' else '🗺️' if category == 'Geography' else '👥' if category == 'Customers' else '🔮'} {category}")
-            
+            parts.append(f'<h3>{icon} {category}</h3>')
+
             for insight in category_insights:
-                severity_class = f"insight-{insight['severity']}"
-                
-                st.markdown(f"""
-                <div class="{severity_class}">
-                    <h4>{insight['title']}</h4>
-                    <p><strong>Finding:</strong> {insight['description']}</p>
-                    <p><strong>Recommendation:</strong> {insight['recommendation']}</p>
+                parts.append(f"""
+                <div class="insight-{insight['severity']}">
+                    <h4>{html.escape(insight['title'])}</h4>
+                    <p><strong>Finding:</strong> {html.escape(insight['description'])}</p>
+                    <p><strong>Recommendation:</strong> {html.escape(insight['recommendation'])}</p>
                 </div>
-                """, unsafe_allow_html=True)
+                """)
+
+    st.markdown("".join(parts), unsafe_allow_html=True)
 
 
 def show_analysis(df):
@@ -520,44 +792,29 @@ def show_analysis(df):
     # Time series decomposition
     st.subheader("📅 Monthly Sales Breakdown")
     
-    monthly_sales = df.groupby(df['date'].dt.to_period('M'))['total_sales'].sum()
+    monthly = monthly_sales(df)
     monthly_df = pd.DataFrame({
-        'Month': [str(m) for m in monthly_sales.index],
-        'Sales': monthly_sales.values
+        'Month': monthly.index.strftime('%Y-%m'),
+        'Sales': monthly.values
     })
-    
-    fig = px.bar(
-        monthly_df,
-        x='Month',
-        y='Sales',
-        title='Monthly Sales Performance',
-        labels={'Sales': 'Total Sales (ETB)'}
+
+    st.plotly_chart(
+        go.Figure(monthly_bar_fig(monthly_df)), use_container_width=True
     )
-    fig.update_layout(height=400)
-    st.plotly_chart(fig, use_container_width=True)
     
     # Product analysis
     st.subheader("🛍️ Product Category Deep Dive")
     
-    product_stats = df.groupby('product_category').agg({
-        'total_sales': ['sum', 'mean', 'count']
-    }).round(2)
-    product_stats.columns = ['Total Sales', 'Avg Transaction', 'Num Transactions']
-    product_stats = product_stats.sort_values('Total Sales', ascending=False)
-    
+    product_stats = stats_table(df, 'product_category')
+
     st.dataframe(product_stats, use_container_width=True)
-    
+
     # Customer segment analysis
     st.subheader("👥 Customer Segment Analysis")
-    
-    segment_sales = df.groupby('customer_segment')['total_sales'].sum().sort_values(ascending=False)
-    
-    fig = px.pie(
-        values=segment_sales.values,
-        names=segment_sales.index,
-        title='Sales Distribution by Customer Segment'
+
+    st.plotly_chart(
+        go.Figure(segment_pie_fig(segment_sales(df))), use_container_width=True
     )
-    st.plotly_chart(fig, use_container_width=True)
 
 
 def show_regional_view(df):
@@ -565,45 +822,25 @@ def show_regional_view(df):
     st.header("🗺️ Regional Performance Analysis")
     
     # Regional metrics
-    region_stats = df.groupby('region').agg({
-        'total_sales': ['sum', 'mean', 'count']
-    }).round(2)
-    region_stats.columns = ['Total Sales', 'Avg Transaction', 'Num Transactions']
-    region_stats = region_stats.sort_values('Total Sales', ascending=False)
-    
+    region_stats = stats_table(df, 'region')
+
     st.subheader("📊 Regional Statistics")
     st.dataframe(region_stats, use_container_width=True)
     
     # Regional comparison
     st.subheader("🏆 Regional Comparison")
-    
-    fig = px.bar(
-        x=region_stats.index,
-        y=region_stats['Total Sales'],
-        title='Total Sales by Region',
-        labels={'x': 'Region', 'y': 'Total Sales (ETB)'},
-        color=region_stats['Total Sales'],
-        color_continuous_scale='Viridis'
+
+    st.plotly_chart(
+        go.Figure(region_comparison_fig(region_stats)), use_container_width=True
     )
-    fig.update_layout(height=400)
-    st.plotly_chart(fig, use_container_width=True)
-    
+
     # Regional trends
     st.subheader("📈 Regional Sales Trends")
-    
-    monthly_regional = df.groupby([df['date'].dt.to_period('M'), 'region'])['total_sales'].sum().reset_index()
-    monthly_regional['date'] = monthly_regional['date'].astype(str)
-    
-    fig = px.line(
-        monthly_regional,
-        x='date',
-        y='total_sales',
-        color='region',
-        title='Monthly Sales by Region',
-        labels={'date': 'Month', 'total_sales': 'Total Sales (ETB)', 'region': 'Region'}
+
+    st.plotly_chart(
+        go.Figure(monthly_regional_fig(monthly_regional_sales(df))),
+        use_container_width=True
     )
-    fig.update_layout(height=500)
-    st.plotly_chart(fig, use_container_width=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,33 @@
+"""
+Pre-train the forecasting service and persist it to disk
+Run once before starting the API so every uvicorn worker loads the
+fitted models instead of retraining Prophet on startup
+"""
+
+import os
+import sys
+
+import joblib
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.model import ForecastingService
+
+ARTIFACT_PATH = 'artifacts/service.joblib'
+
+
+def main():
+    """Train the service and save the artifact"""
+    print("Loading sales data and training models...")
+    service = ForecastingService()
+    service.load_data()
+    service.train_model()
+
+    os.makedirs(os.path.dirname(ARTIFACT_PATH), exist_ok=True)
+    joblib.dump(service, ARTIFACT_PATH)
+    print(f"✓ Trained service saved to {ARTIFACT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
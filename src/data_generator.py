@@ -6,17 +6,17 @@ Generates synthetic sales data for business forecasting
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
 
 class EthiopiaSalesDataGenerator:
     """Generate synthetic sales data for Ethiopian business context"""
-    
+
     def __init__(self, start_date='2020-01-01', end_date='2024-10-31', seed=42):
         self.start_date = pd.to_datetime(start_date)
         self.end_date = pd.to_datetime(end_date)
         self.seed = seed
-        np.random.seed(seed)
-        random.seed(seed)
+        # Generator API: faster bit generator (PCG64) than the legacy
+        # global state, and keeps this instance's stream self-contained
+        self.rng = np.random.default_rng(seed)
         
         # Ethiopian context
         self.regions = ['Addis Ababa', 'Oromia', 'Amhara', 'Tigray', 'SNNPR', 'Somali', 'Afar', 'Dire Dawa']
@@ -28,109 +28,121 @@ class EthiopiaSalesDataGenerator:
         """Generate daily date range"""
         return pd.date_range(start=self.start_date, end=self.end_date, freq='D')
     
-    def add_seasonality(self, base_value, date):
-        """Add seasonal patterns based on Ethiopian calendar and holidays"""
+    def add_seasonality(self, base_value, dates):
+        """Add seasonal patterns based on Ethiopian calendar and holidays
+
+        Vectorized: `dates` is a DatetimeIndex aligned with `base_value`.
+        """
+        month = dates.month.to_numpy()
+        day = dates.day.to_numpy()
+        dayofweek = dates.dayofweek.to_numpy()
+
         # Monthly seasonality
-        month_factor = 1 + 0.2 * np.sin(2 * np.pi * date.month / 12)
-        
+        factor = 1 + 0.2 * np.sin(2 * np.pi * month / 12)
+
         # Ethiopian holidays boost (approximate Gregorian dates)
-        if date.month == 9 and 1 <= date.day <= 15:  # Ethiopian New Year
-            month_factor *= 1.5
-        elif date.month == 1 and 7 <= date.day <= 20:  # Timkat
-            month_factor *= 1.4
-        elif date.month == 9 and 27 <= date.day <= 30:  # Meskel
-            month_factor *= 1.3
-        elif date.month == 12:  # Christmas season
-            month_factor *= 1.6
-            
+        new_year = (month == 9) & (day >= 1) & (day <= 15)  # Ethiopian New Year
+        timkat = (month == 1) & (day >= 7) & (day <= 20)  # Timkat
+        meskel = (month == 9) & (day >= 27) & (day <= 30)  # Meskel
+        christmas = month == 12  # Christmas season
+        factor *= np.where(new_year, 1.5, 1.0)
+        factor *= np.where(timkat, 1.4, 1.0)
+        factor *= np.where(meskel, 1.3, 1.0)
+        factor *= np.where(christmas, 1.6, 1.0)
+
         # Weekly pattern (weekend slightly lower)
-        if date.dayofweek >= 5:  # Saturday, Sunday
-            month_factor *= 0.85
-            
-        return base_value * month_factor
-    
+        factor *= np.where(dayofweek >= 5, 0.85, 1.0)  # Saturday, Sunday
+
+        return base_value * factor
+
     def add_trend(self, base_value, days_from_start):
         """Add growth trend"""
         # Annual growth rate of 8-12%
         annual_growth = 0.10
         daily_growth = annual_growth / 365
         return base_value * (1 + daily_growth * days_from_start)
-    
+
     def add_noise(self, value):
         """Add random noise"""
-        noise_factor = np.random.normal(1, 0.15)
+        noise_factor = self.rng.normal(1, 0.15, size=len(value))
         return value * noise_factor
-    
+
     def generate_sales_data(self):
-        """Generate complete sales dataset"""
+        """Generate complete sales dataset in one vectorized pass"""
         dates = self.generate_date_range()
-        data = []
-        
-        transaction_id = 1000
-        
-        for date in dates:
-            days_from_start = (date - self.start_date).days
-            
-            # Generate 5-20 transactions per day
-            num_transactions = random.randint(5, 20)
-            
-            for _ in range(num_transactions):
-                region = random.choice(self.regions)
-                product = random.choice(self.product_categories)
-                segment = random.choice(self.customer_segments)
-                
-                # Base sales amount varies by product
-                base_amounts = {
-                    'Coffee': 5000, 'Teff': 3000, 'Electronics': 15000,
-                    'Textiles': 8000, 'Spices': 2000, 'Livestock': 20000,
-                    'Vegetables': 1500, 'Injera': 1000, 'Leather Goods': 12000,
-                    'Cereals': 4000
-                }
-                
-                base_amount = base_amounts.get(product, 5000)
-                
-                # Apply transformations
-                amount = self.add_trend(base_amount, days_from_start)
-                amount = self.add_seasonality(amount, date)
-                amount = self.add_noise(amount)
-                amount = max(100, amount)  # Minimum transaction
-                
-                # Quantity based on amount and average unit price
-                unit_price = base_amount / 10
-                quantity = int(amount / unit_price)
-                quantity = max(1, quantity)
-                
-                # Regional adjustment
-                if region == 'Addis Ababa':
-                    amount *= 1.3
-                elif region == 'Oromia':
-                    amount *= 1.1
-                elif region == 'Afar':
-                    amount *= 0.7
-                    
-                # Segment adjustment
-                if segment == 'Wholesale':
-                    amount *= 1.5
-                    quantity *= 2
-                elif segment == 'Export':
-                    amount *= 2.0
-                    quantity *= 3
-                    
-                data.append({
-                    'transaction_id': transaction_id,
-                    'date': date,
-                    'region': region,
-                    'product_category': product,
-                    'customer_segment': segment,
-                    'quantity': quantity,
-                    'unit_price': round(amount / quantity, 2),
-                    'total_sales': round(amount, 2),
-                    'currency': 'ETB'
-                })
-                
-                transaction_id += 1
-        
-        df = pd.DataFrame(data)
+        n_days = len(dates)
+
+        # Generate 5-20 transactions per day
+        tx_per_day = self.rng.integers(5, 21, size=n_days)
+        total = int(tx_per_day.sum())
+
+        tx_dates = pd.DatetimeIndex(np.repeat(dates.values, tx_per_day))
+        days_from_start = (
+            (tx_dates - self.start_date) // pd.Timedelta(days=1)
+        ).to_numpy()
+
+        # Draw regions/products/segments as index arrays (SoA layout)
+        regions = np.array(self.regions)
+        products = np.array(self.product_categories)
+        segments = np.array(self.customer_segments)
+        region_idx = self.rng.integers(0, len(regions), size=total)
+        product_idx = self.rng.integers(0, len(products), size=total)
+        segment_idx = self.rng.integers(0, len(segments), size=total)
+
+        # Base sales amount varies by product
+        base_amounts = {
+            'Coffee': 5000, 'Teff': 3000, 'Electronics': 15000,
+            'Textiles': 8000, 'Spices': 2000, 'Livestock': 20000,
+            'Vegetables': 1500, 'Injera': 1000, 'Leather Goods': 12000,
+            'Cereals': 4000
+        }
+        base_amount = np.array(
+            [base_amounts.get(p, 5000) for p in self.product_categories],
+            dtype=np.float64
+        )[product_idx]
+
+        # Apply transformations
+        amount = self.add_trend(base_amount, days_from_start)
+        amount = self.add_seasonality(amount, tx_dates)
+        amount = self.add_noise(amount)
+        amount = np.maximum(100, amount)  # Minimum transaction
+
+        # Quantity based on amount and average unit price
+        unit_price = base_amount / 10
+        quantity = np.maximum(1, (amount / unit_price).astype(np.int64))
+
+        # Regional adjustment
+        region_mult = np.ones(len(regions))
+        region_mult[regions == 'Addis Ababa'] = 1.3
+        region_mult[regions == 'Oromia'] = 1.1
+        region_mult[regions == 'Afar'] = 0.7
+        amount = amount * region_mult[region_idx]
+
+        # Segment adjustment
+        seg_amount_mult = np.ones(len(segments))
+        seg_quantity_mult = np.ones(len(segments), dtype=np.int64)
+        seg_amount_mult[segments == 'Wholesale'] = 1.5
+        seg_quantity_mult[segments == 'Wholesale'] = 2
+        seg_amount_mult[segments == 'Export'] = 2.0
+        seg_quantity_mult[segments == 'Export'] = 3
+        amount = amount * seg_amount_mult[segment_idx]
+        quantity = quantity * seg_quantity_mult[segment_idx]
+
+        df = pd.DataFrame({
+            'transaction_id': np.arange(1000, 1000 + total, dtype=np.int64),
+            'date': tx_dates,
+            'region': regions[region_idx],
+            'product_category': products[product_idx],
+            'customer_segment': segments[segment_idx],
+            'quantity': quantity,
+            'unit_price': np.round(amount / quantity, 2),
+            'total_sales': np.round(amount, 2),
+            # Constant column as a single-level categorical: one code per
+            # row instead of a million references to the same string
+            'currency': pd.Categorical.from_codes(
+                np.zeros(total, dtype=np.int8), categories=['ETB']
+            )
+        })
         return df
     
     def save_data(self, output_path='data/raw/ethiopia_sales_raw.csv'):
@@ -141,10 +153,26 @@ class EthiopiaSalesDataGenerator:
         
         print("Generating Ethiopia sales data...")
         df = self.generate_sales_data()
+
+        # Low-cardinality columns as category: smaller in memory and
+        # dictionary-encoded in the Parquet file
+        for col in ('region', 'product_category', 'customer_segment', 'currency'):
+            df[col] = df[col].astype('category')
+
         df.to_csv(output_path, index=False)
         print(f"Generated {len(df)} transactions")
         print(f"Date range: {df['date'].min()} to {df['date'].max()}")
         print(f"Data saved to {output_path}")
+
+        # Typed, compressed Parquet copy: loads 5-20x faster than CSV and
+        # skips date re-parsing on the next startup
+        parquet_path = output_path.replace('.csv', '.parquet')
+        try:
+            df.to_parquet(parquet_path, engine='pyarrow')
+            print(f"Parquet copy saved to {parquet_path}")
+        except ImportError:
+            print("pyarrow not installed; skipping Parquet copy")
+
         return df
 
 
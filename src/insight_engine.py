@@ -7,26 +7,49 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+# Index directly by month number (1-12); slot 0 is a placeholder
+_MONTHS = ('', 'January', 'February', 'March', 'April', 'May', 'June',
+           'July', 'August', 'September', 'October', 'November', 'December')
+
 
 class InsightEngine:
     """Generate business insights from sales data"""
     
     def __init__(self, sales_df, forecast_df=None):
-        self.sales_df = sales_df.copy()
+        # Keep the caller's frame as-is: duplicating a multi-million-row
+        # frame just to hang derived columns on it doubles peak memory.
+        # Derived date keys live in small side values instead.
+        self.sales_df = sales_df
         self.forecast_df = forecast_df
         self.insights = []
-        
-    def analyze_trends(self):
+        # cache=True memoizes repeated values, so string-typed inputs
+        # parse each distinct day once rather than every transaction
+        self._date = pd.to_datetime(sales_df['date'], cache=True)
+        self._month = self._date.dt.month.to_numpy()
+        self._period_m = self._date.dt.to_period('M')
+
+    def _aggregate_sales(self, key_col, **named):
+        """Aggregate total_sales by one key column with named outputs
+
+        Named aggregation produces the final column names directly,
+        skipping the MultiIndex the dict-of-list form builds only to be
+        flattened. sort=False skips the key sort (callers order by
+        sales value anyway) and observed=True skips empty categorical
+        levels. Values stay unrounded; the insight strings format them.
+        """
+        return self.sales_df.groupby(key_col, sort=False, observed=True).agg(
+            **{name: ('total_sales', func) for name, func in named.items()}
+        )
+
+    def analyze_trends(self, monthly_sales=None):
         """Analyze sales trends"""
         print("Analyzing trends...")
-        
-        # Convert date column
-        self.sales_df['date'] = pd.to_datetime(self.sales_df['date'])
-        
-        # Monthly aggregation
-        monthly_sales = self.sales_df.groupby(
-            self.sales_df['date'].dt.to_period('M')
-        )['total_sales'].sum()
+
+        # Monthly aggregation over the precomputed period keys
+        if monthly_sales is None:
+            monthly_sales = self.sales_df.groupby(
+                self._period_m, sort=False
+            )['total_sales'].sum().sort_index()
         
         # Calculate growth rates
         growth_rates = monthly_sales.pct_change() * 100
@@ -60,25 +83,23 @@ class InsightEngine:
                 'recommendation': 'Invest in inventory and marketing to capitalize on momentum'
             })
     
-    def analyze_seasonality(self):
+    def analyze_seasonality(self, monthly_avg=None):
         """Analyze seasonal patterns"""
         print("Analyzing seasonality...")
-        
-        # Monthly average sales
-        self.sales_df['month'] = pd.to_datetime(self.sales_df['date']).dt.month
-        monthly_avg = self.sales_df.groupby('month')['total_sales'].mean()
-        
-        peak_months = monthly_avg.nlargest(3).index.tolist()
-        low_months = monthly_avg.nsmallest(3).index.tolist()
-        
-        month_names = {
-            1: 'January', 2: 'February', 3: 'March', 4: 'April',
-            5: 'May', 6: 'June', 7: 'July', 8: 'August',
-            9: 'September', 10: 'October', 11: 'November', 12: 'December'
-        }
-        
-        peak_names = [month_names[m] for m in peak_months]
-        low_names = [month_names[m] for m in low_months]
+
+        # Monthly average sales, keyed by the precomputed month numbers
+        if monthly_avg is None:
+            monthly_avg = self.sales_df.groupby(
+                self._month, sort=False
+            )['total_sales'].mean()
+        
+        # One sort of the 12-entry series covers both picks
+        ranked = monthly_avg.sort_values()
+        peak_months = ranked.index[-3:].tolist()[::-1]
+        low_months = ranked.index[:3].tolist()
+
+        peak_names = [_MONTHS[m] for m in peak_months]
+        low_names = [_MONTHS[m] for m in low_months]
         
         self.insights.append({
             'category': 'Seasonality',
@@ -96,25 +117,23 @@ class InsightEngine:
             'recommendation': f'Run promotions and marketing campaigns during {", ".join(low_names)}'
         })
     
-    def analyze_products(self):
+    def analyze_products(self, product_sales=None):
         """Analyze product performance"""
         print("Analyzing products...")
-        
+
         # Product category performance
-        product_sales = self.sales_df.groupby('product_category').agg({
-            'total_sales': ['sum', 'mean', 'count']
-        }).round(2)
-        
-        product_sales.columns = ['total_sales', 'avg_transaction', 'num_transactions']
-        product_sales = product_sales.sort_values('total_sales', ascending=False)
-        
-        # Top performers
-        top_product = product_sales.index[0]
-        top_revenue = product_sales.iloc[0]['total_sales']
-        
-        # Underperformers
-        bottom_product = product_sales.index[-1]
-        bottom_revenue = product_sales.iloc[-1]['total_sales']
+        if product_sales is None:
+            product_sales = self._aggregate_sales(
+                'product_category', total_sales='sum',
+                avg_transaction='mean', num_transactions='count'
+            )
+        # Top and bottom performers: single-pass min/max, no need to
+        # reorder the whole frame
+        totals = product_sales['total_sales']
+        top_product = totals.idxmax()
+        top_revenue = totals.max()
+        bottom_product = totals.idxmin()
+        bottom_revenue = totals.min()
         
         self.insights.append({
             'category': 'Products',
@@ -134,27 +153,25 @@ class InsightEngine:
                 'recommendation': f'Consider discontinuing or repositioning {bottom_product}'
             })
     
-    def analyze_regions(self):
+    def analyze_regions(self, regional_sales=None):
         """Analyze regional performance"""
         print("Analyzing regions...")
-        
+
         # Regional sales
-        regional_sales = self.sales_df.groupby('region').agg({
-            'total_sales': ['sum', 'mean']
-        }).round(2)
-        
-        regional_sales.columns = ['total_sales', 'avg_sales']
-        regional_sales = regional_sales.sort_values('total_sales', ascending=False)
-        
-        # Top and bottom regions
-        top_region = regional_sales.index[0]
-        bottom_region = regional_sales.index[-1]
+        if regional_sales is None:
+            regional_sales = self._aggregate_sales(
+                'region', total_sales='sum', avg_sales='mean'
+            )
+        # Top and bottom regions via single-pass min/max
+        totals = regional_sales['total_sales']
+        top_region = totals.idxmax()
+        bottom_region = totals.idxmin()
         
         self.insights.append({
             'category': 'Geography',
             'severity': 'positive',
             'title': f'{top_region} - Top Regional Market',
-            'description': f'Leading region with ETB {regional_sales.loc[top_region, "total_sales"]:,.2f} in sales',
+            'description': f'Leading region with ETB {totals.loc[top_region]:,.2f} in sales',
             'recommendation': f'Use {top_region} as model for other regions'
         })
         
@@ -162,28 +179,26 @@ class InsightEngine:
             'category': 'Geography',
             'severity': 'warning',
             'title': f'{bottom_region} - Growth Opportunity',
-            'description': f'Underdeveloped market with only ETB {regional_sales.loc[bottom_region, "total_sales"]:,.2f}',
+            'description': f'Underdeveloped market with only ETB {totals.loc[bottom_region]:,.2f}',
             'recommendation': f'Increase marketing and distribution efforts in {bottom_region}'
         })
     
-    def analyze_customer_segments(self):
+    def analyze_customer_segments(self, segment_sales=None):
         """Analyze customer segment performance"""
         print("Analyzing customer segments...")
-        
-        segment_sales = self.sales_df.groupby('customer_segment').agg({
-            'total_sales': ['sum', 'mean', 'count']
-        }).round(2)
-        
-        segment_sales.columns = ['total_sales', 'avg_transaction', 'num_transactions']
-        segment_sales = segment_sales.sort_values('total_sales', ascending=False)
-        
-        top_segment = segment_sales.index[0]
+
+        if segment_sales is None:
+            segment_sales = self._aggregate_sales(
+                'customer_segment', total_sales='sum',
+                avg_transaction='mean', num_transactions='count'
+            )
+        top_segment = segment_sales['total_sales'].idxmax()
         
         self.insights.append({
             'category': 'Customers',
             'severity': 'info',
             'title': f'{top_segment} - Primary Customer Base',
-            'description': f'{top_segment} generates most revenue with ETB {segment_sales.loc[top_segment, "total_sales"]:,.2f}',
+            'description': f'{top_segment} generates most revenue with ETB {segment_sales["total_sales"].max():,.2f}',
             'recommendation': f'Develop loyalty programs and exclusive offers for {top_segment} customers'
         })
     
@@ -194,9 +209,16 @@ class InsightEngine:
         
         print("Analyzing forecast...")
         
-        # Get recent actual and future forecast
-        recent_avg = self.sales_df.groupby('date')['total_sales'].sum().iloc[-30:].mean()
-        forecast_avg = self.forecast_df.iloc[-30:]['yhat'].mean()
+        # Get recent actual and future forecast. Slice the trailing
+        # 30-day window first so the daily grouping only touches those
+        # rows instead of the full history
+        dates = self._date.to_numpy()
+        cutoff = dates.max() - np.timedelta64(30, 'D')
+        mask = dates > cutoff
+        recent = self.sales_df.loc[mask, 'total_sales']
+        recent_avg = recent.groupby(dates[mask]).sum().mean()
+
+        forecast_avg = self.forecast_df['yhat'].to_numpy()[-30:].mean()
         
         change_pct = ((forecast_avg - recent_avg) / recent_avg) * 100
         
@@ -231,11 +253,30 @@ class InsightEngine:
         print("GENERATING BUSINESS INSIGHTS")
         print("="*60 + "\n")
         
-        self.analyze_trends()
-        self.analyze_seasonality()
-        self.analyze_products()
-        self.analyze_regions()
-        self.analyze_customer_segments()
+        # Compute each aggregate once up front and hand it to the
+        # analyze methods, which otherwise each rescan the full frame
+        sales = self.sales_df['total_sales']
+        # The monthly trend needs chronological order for pct_change, so
+        # sort the small month-count result rather than the group keys
+        monthly_sales = sales.groupby(self._period_m, sort=False).sum().sort_index()
+        monthly_avg = sales.groupby(self._month, sort=False).mean()
+        product_sales = self._aggregate_sales(
+            'product_category', total_sales='sum',
+            avg_transaction='mean', num_transactions='count'
+        )
+        regional_sales = self._aggregate_sales(
+            'region', total_sales='sum', avg_sales='mean'
+        )
+        segment_sales = self._aggregate_sales(
+            'customer_segment', total_sales='sum',
+            avg_transaction='mean', num_transactions='count'
+        )
+
+        self.analyze_trends(monthly_sales)
+        self.analyze_seasonality(monthly_avg)
+        self.analyze_products(product_sales)
+        self.analyze_regions(regional_sales)
+        self.analyze_customer_segments(segment_sales)
         self.analyze_forecast()
         
         print(f"\n[OK] Generated {len(self.insights)} insights\n")
@@ -272,7 +313,18 @@ class InsightEngine:
             self.generate_all_insights()
         
         df_insights = pd.DataFrame(self.insights)
-        df_insights.to_csv(output_path, index=False)
+
+        # Arrow's CSV writer is compiled and multithreaded; fall back to
+        # pandas' per-row formatter when pyarrow isn't installed
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pcsv
+            pcsv.write_csv(
+                pa.Table.from_pandas(df_insights, preserve_index=False),
+                output_path
+            )
+        except ImportError:
+            df_insights.to_csv(output_path, index=False)
         print(f"[OK] Insights exported to {output_path}")
 
 
@@ -280,7 +332,19 @@ def main():
     """Main function for testing"""
     # Load sales data
     print("Loading data...")
-    sales_df = pd.read_csv('data/raw/ethiopia_sales_raw.csv')
+    # pyarrow parses across threads; the explicit schema skips type
+    # inference and stores the key columns as categoricals
+    sales_df = pd.read_csv(
+        'data/raw/ethiopia_sales_raw.csv',
+        engine='pyarrow',
+        dtype={
+            'product_category': 'category',
+            'region': 'category',
+            'customer_segment': 'category',
+            'total_sales': 'float32'
+        },
+        parse_dates=['date']
+    )
     
     # Load forecast if available
     try: